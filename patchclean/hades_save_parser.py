@@ -9,10 +9,103 @@ import struct
 import json
 import lz4.block
 import argparse
+import functools
+import hashlib
+import itertools
+import mmap
+import sys
 import zlib
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, List, Union, Optional
+from typing import Dict, Any, Iterator, List, Union, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Precompiled little-endian codecs for luabin primitives
+_U8 = struct.Struct('<B')
+_U32 = struct.Struct('<I')
+_F64 = struct.Struct('<d')
+
+# A (number key, number value) table entry: tag + double + tag + double
+_NUMBER_ENTRY_SIZE = 18
+# Below this many array entries numpy setup costs more than it saves
+_BULK_MIN_ENTRIES = 16
+# Luabin at least this large is tokenized by the numba kernel; below it,
+# importing numba and loading its compiled cache costs more than it saves
+NUMBA_MIN_LUABIN_SIZE = 32 * 1024 * 1024
+
+VALIDATION_CACHE_PATH = Path.home() / ".cache" / "hades_save_parser" / "validations.json"
+# Bump when parsing or validation rules change to drop cached verdicts
+VALIDATION_SCHEMA_VERSION = 1
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode(value: str) -> bytes:
+    """UTF-8 encode, memoized: luabin repeats a small set of keys
+    ("CurrentRun", "Hero", ...) thousands of times"""
+    return value.encode('utf-8')
+
+
+def json_default(value: Any) -> Any:
+    """json.dump fallback for the array types the reader produces"""
+    if isinstance(value, (bytes, bytearray)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def has_non_finite(data: Any) -> bool:
+    """True if any float nested in data is inf, -inf or NaN"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is float:
+            if value - value != 0.0:  # inf - inf and NaN - NaN are NaN
+                return True
+        elif value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list:
+            stack.extend(value)
+    return False
+
+
+def dump_json(data: Any, file_path: Union[str, Path], indent: int = 2):
+    """Write data as UTF-8 JSON, using orjson's C encoder when it supports
+    the requested indentation.
+
+    orjson writes non-finite floats as null, which would turn Lua's +-inf
+    and NaN into nil on the way back, so such data goes through json, which
+    writes Infinity/NaN."""
+    if orjson is not None and indent == 2 and not has_non_finite(data):
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, default=json_default, option=options))
+        return
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False, default=json_default)
+
+
+def load_json(file_path: Union[str, Path]) -> Any:
+    """Read a JSON file, using orjson's C decoder when available"""
+    # One sized read of raw bytes; both decoders take UTF-8 bytes directly
+    data = Path(file_path).read_bytes()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Infinity/NaN literals are only accepted by json
+            pass
+    return json.loads(data)
 
 
 class LuabinSerializer:
@@ -29,6 +122,15 @@ class LuabinSerializer:
     @staticmethod
     def get_type_code(value: Any) -> int:
         """Get Lua type code for a Python value"""
+        value_type = type(value)
+        # bool is an int subclass, so it must be settled before the lookup
+        if value_type is bool:
+            return LuabinSerializer.TYPE_TRUE if value else LuabinSerializer.TYPE_FALSE
+        code = _TYPE_CODES.get(value_type)
+        if code is not None:
+            return code
+
+        # Subclasses (e.g. numpy scalars) miss the exact-type table
         if value is None:
             return LuabinSerializer.TYPE_NULL
         elif value is True:
@@ -45,6 +147,112 @@ class LuabinSerializer:
             raise ValueError(f"Unsupported type for Lua serialization: {type(value)}")
 
 
+# Exact Python type -> Lua type code, for LuabinSerializer.get_type_code
+_TYPE_CODES = {
+    type(None): LuabinSerializer.TYPE_NULL,
+    int: LuabinSerializer.TYPE_NUMBER,
+    float: LuabinSerializer.TYPE_NUMBER,
+    str: LuabinSerializer.TYPE_STRING,
+    dict: LuabinSerializer.TYPE_TABLE,
+}
+
+
+# Error codes returned by _scan_luabin
+_SCAN_UNDERRUN = -1
+_SCAN_FULL = -2
+_SCAN_BAD_TYPE = -3
+_SCAN_TABLE_TOO_LARGE = -4
+
+_TYPE_NULL = LuabinSerializer.TYPE_NULL
+_TYPE_FALSE = LuabinSerializer.TYPE_FALSE
+_TYPE_TRUE = LuabinSerializer.TYPE_TRUE
+_TYPE_NUMBER = LuabinSerializer.TYPE_NUMBER
+_TYPE_STRING = LuabinSerializer.TYPE_STRING
+_TYPE_TABLE = LuabinSerializer.TYPE_TABLE
+
+
+def _scan_luabin_kernel(buf, out_types, out_off, out_len, out_num):
+    """Flatten luabin into a pre-order token stream.
+
+    Each token records its type; numbers are decoded into out_num,
+    strings record (offset, length) and tables record their entry count
+    in out_len. Returns the token count or a negative _SCAN_* code.
+    Compiled with numba by _load_scanner."""
+    n = buf.shape[0]
+    cap = out_types.shape[0]
+    scratch = np.empty(8, np.uint8)
+    pending = np.int64(buf[0])
+    pos = 1
+    count = 0
+    while pending > 0:
+        if pos >= n:
+            return _SCAN_UNDERRUN
+        if count >= cap:
+            return _SCAN_FULL
+        tag = buf[pos]
+        pos += 1
+        pending -= 1
+        out_types[count] = tag
+        if tag == _TYPE_NUMBER:
+            if pos + 8 > n:
+                return _SCAN_UNDERRUN
+            scratch[:] = buf[pos:pos + 8]
+            out_num[count] = scratch.view(np.float64)[0]
+            pos += 8
+        elif tag == _TYPE_STRING:
+            if pos + 4 > n:
+                return _SCAN_UNDERRUN
+            length = (np.int64(buf[pos]) | (np.int64(buf[pos + 1]) << 8) |
+                      (np.int64(buf[pos + 2]) << 16) | (np.int64(buf[pos + 3]) << 24))
+            pos += 4
+            if pos + length > n:
+                return _SCAN_UNDERRUN
+            out_off[count] = pos
+            out_len[count] = length
+            pos += length
+        elif tag == _TYPE_TABLE:
+            if pos + 8 > n:
+                return _SCAN_UNDERRUN
+            total = np.int64(0)
+            for i in range(8):
+                # Array size and hash size, both little-endian u32
+                total += np.int64(buf[pos + i]) << (8 * (i % 4))
+            pos += 8
+            if total > 10_000_000:
+                return _SCAN_TABLE_TOO_LARGE
+            out_len[count] = total
+            pending += 2 * total
+        elif tag != _TYPE_NULL and tag != _TYPE_FALSE and tag != _TYPE_TRUE:
+            return _SCAN_BAD_TYPE
+        count += 1
+    return count
+
+
+# Compiled _scan_luabin_kernel; None until loaded, False if numba is missing
+_scan_luabin = None
+
+
+def _load_scanner():
+    """Compile (or load from numba's on-disk cache) the luabin scanner.
+    numba is imported here, not at module import, since it is only worth
+    its startup cost for very large luabin."""
+    global _scan_luabin
+    if _scan_luabin is None:
+        try:
+            from numba import njit
+        except ImportError:
+            njit = None
+        if njit is None or np is None:
+            _scan_luabin = False
+        else:
+            _scan_luabin = njit(cache=True)(_scan_luabin_kernel)
+    return _scan_luabin or None
+
+
+# Marks a parse_tokens frame that is waiting for a key rather than a value
+_NO_KEY = object()
+
+
 class LuabinReader:
     """Reads Luabin binary data"""
 
@@ -55,21 +263,21 @@ class LuabinReader:
     def read_uint8(self) -> int:
         if self.offset >= len(self.buffer):
             raise ValueError("Buffer underrun: attempting to read beyond buffer")
-        value = struct.unpack_from('<B', self.buffer, self.offset)[0]
+        value = _U8.unpack_from(self.buffer, self.offset)[0]
         self.offset += 1
         return value
 
     def read_uint32(self) -> int:
         if self.offset + 4 > len(self.buffer):
             raise ValueError("Buffer underrun: attempting to read beyond buffer")
-        value = struct.unpack_from('<I', self.buffer, self.offset)[0]
+        value = _U32.unpack_from(self.buffer, self.offset)[0]
         self.offset += 4
         return value
 
     def read_double(self) -> float:
         if self.offset + 8 > len(self.buffer):
             raise ValueError("Buffer underrun: attempting to read beyond buffer")
-        value = struct.unpack_from('<d', self.buffer, self.offset)[0]
+        value = _F64.unpack_from(self.buffer, self.offset)[0]
         self.offset += 8
         return value
 
@@ -98,8 +306,30 @@ class LuabinReader:
         else:
             raise ValueError(f"Unknown Luabin type code: {type_code}")
 
-    def read_table(self) -> Dict[str, Any]:
-        """Read a Lua table"""
+    def read_number_entries(self, count: int) -> Tuple[List[float], List[float]]:
+        """Bulk-decode up to `count` consecutive (number, number) table entries
+        with numpy, stopping at the first entry of any other shape"""
+        rows = min(count, (len(self.buffer) - self.offset) // _NUMBER_ENTRY_SIZE)
+        if rows <= 0:
+            return [], []
+
+        entries = np.frombuffer(self.buffer, dtype=np.uint8,
+                                count=rows * _NUMBER_ENTRY_SIZE,
+                                offset=self.offset).reshape(rows, _NUMBER_ENTRY_SIZE)
+        numeric = ((entries[:, 0] == LuabinSerializer.TYPE_NUMBER) &
+                   (entries[:, 9] == LuabinSerializer.TYPE_NUMBER))
+        if not numeric.all():
+            rows = int(numeric.argmin())
+            entries = entries[:rows]
+
+        keys = entries[:, 1:9].copy().view('<f8').ravel().tolist()
+        values = entries[:, 10:18].copy().view('<f8').ravel().tolist()
+        self.offset += rows * _NUMBER_ENTRY_SIZE
+        return keys, values
+
+    def begin_table(self) -> Tuple[Dict[str, Any], int]:
+        """Read a table header plus any bulk-decodable array part; returns the
+        table and the number of entries still to be read into it"""
         array_size = self.read_uint32()
         hash_size = self.read_uint32()
         total_size = array_size + hash_size
@@ -108,28 +338,200 @@ class LuabinReader:
             raise ValueError(f"Table size too large: {total_size}")
 
         table = {}
-        for _ in range(total_size):
-            key_type = self.read_uint8()
-            key = self.read_value(key_type)
-            value_type = self.read_uint8()
-            value = self.read_value(value_type)
-            table[str(key)] = value
+        remaining = total_size
+        if np is not None and array_size >= _BULK_MIN_ENTRIES:
+            # Purely numeric array parts are decoded in one pass
+            keys, values = self.read_number_entries(array_size)
+            table.update(zip(map(str, keys), values))
+            remaining -= len(keys)
+        return table, remaining
+
+    def read_entries(self, container: Union[List[Any], Dict[str, Any]], count: int):
+        """Read `count` values (into a list) or key/value entries (into a
+        dict), descending into nested tables with an explicit stack rather
+        than recursion.
+
+        Numbers and strings, nearly every key and value, are decoded inline
+        against a local offset; this loop is the whole parse, so it avoids a
+        method call per primitive."""
+        buffer = self.buffer
+        end = len(buffer)
+        offset = self.offset
+        unpack_u32 = _U32.unpack_from
+        unpack_f64 = _F64.unpack_from
+        TYPE_NUMBER = LuabinSerializer.TYPE_NUMBER
+        TYPE_STRING = LuabinSerializer.TYPE_STRING
+        TYPE_TABLE = LuabinSerializer.TYPE_TABLE
+
+        stack = []
+        target = container
+        remaining = count
+        is_table = type(container) is dict
+        try:
+            while True:
+                if not remaining:
+                    if not stack:
+                        break
+                    target, remaining, is_table = stack.pop()
+                    continue
+                remaining -= 1
+
+                if is_table:
+                    tag = buffer[offset]
+                    offset += 1
+                    if tag == TYPE_STRING:
+                        length = unpack_u32(buffer, offset)[0]
+                        offset += 4
+                        if offset + length > end:
+                            raise ValueError(f"Invalid string length: {length}")
+                        key = buffer[offset:offset + length].decode('utf-8')
+                        offset += length
+                    elif tag == TYPE_NUMBER:
+                        key = str(unpack_f64(buffer, offset)[0])
+                        offset += 8
+                    else:
+                        self.offset = offset
+                        key = str(self.read_value(tag))
+                        offset = self.offset
+
+                tag = buffer[offset]
+                offset += 1
+                if tag == TYPE_NUMBER:
+                    value = unpack_f64(buffer, offset)[0]
+                    offset += 8
+                elif tag == TYPE_STRING:
+                    length = unpack_u32(buffer, offset)[0]
+                    offset += 4
+                    if offset + length > end:
+                        raise ValueError(f"Invalid string length: {length}")
+                    value = buffer[offset:offset + length].decode('utf-8')
+                    offset += length
+                elif tag == TYPE_TABLE:
+                    self.offset = offset
+                    value, pending = self.begin_table()
+                    offset = self.offset
+                else:
+                    self.offset = offset
+                    value = self.read_value(tag)
+                    offset = self.offset
 
+                if is_table:
+                    target[key] = value
+                else:
+                    target.append(value)
+
+                if tag == TYPE_TABLE:
+                    # Fill the new table before continuing with this one
+                    stack.append((target, remaining, is_table))
+                    target = value
+                    remaining = pending
+                    is_table = True
+        except (IndexError, struct.error):
+            raise ValueError("Buffer underrun: attempting to read beyond buffer") from None
+        finally:
+            self.offset = offset
+
+    def read_table(self) -> Dict[str, Any]:
+        """Read a Lua table"""
+        table, remaining = self.begin_table()
+        self.read_entries(table, remaining)
         return table
 
+    def scan_tokens(self):
+        """Run the compiled scanner, growing the token arrays if needed"""
+        buf = np.frombuffer(self.buffer, dtype=np.uint8)
+        capacity = len(buf) // 4 + 16
+        while True:
+            types = np.empty(capacity, dtype=np.uint8)
+            offsets = np.empty(capacity, dtype=np.int64)
+            lengths = np.empty(capacity, dtype=np.int64)
+            numbers = np.empty(capacity, dtype=np.float64)
+            count = _scan_luabin(buf, types, offsets, lengths, numbers)
+            if count != _SCAN_FULL:
+                break
+            # Every token takes at least one byte, so this always fits
+            capacity = len(buf)
+
+        if count == _SCAN_UNDERRUN:
+            raise ValueError("Buffer underrun: attempting to read beyond buffer")
+        if count == _SCAN_BAD_TYPE:
+            raise ValueError("Unknown Luabin type code")
+        if count == _SCAN_TABLE_TOO_LARGE:
+            raise ValueError("Table size too large")
+        return (types[:count].tolist(), offsets[:count].tolist(),
+                lengths[:count].tolist(), numbers[:count].tolist())
+
+    def parse_tokens(self) -> List[Any]:
+        """Parse via the compiled scanner; Python only builds the dicts.
+
+        Tokens are in pre-order, so tables are filled from an explicit stack
+        of (table, entries left, pending key) frames rather than recursion."""
+        types, offsets, lengths, numbers = self.scan_tokens()
+        buffer = self.buffer
+        TYPE_NUMBER = LuabinSerializer.TYPE_NUMBER
+        TYPE_STRING = LuabinSerializer.TYPE_STRING
+        TYPE_TABLE = LuabinSerializer.TYPE_TABLE
+        TYPE_TRUE = LuabinSerializer.TYPE_TRUE
+        TYPE_FALSE = LuabinSerializer.TYPE_FALSE
+
+        data = []
+        stack = []
+        # The frame being filled; table is None at the top level, where
+        # values go to data
+        table = None
+        remaining = 0
+        key = _NO_KEY
+        for i, tag in enumerate(types):
+            if tag == TYPE_NUMBER:
+                value = numbers[i]
+            elif tag == TYPE_STRING:
+                start = offsets[i]
+                value = bytes(buffer[start:start + lengths[i]]).decode('utf-8')
+            elif tag == TYPE_TABLE:
+                value = {}
+            elif tag == TYPE_TRUE:
+                value = True
+            elif tag == TYPE_FALSE:
+                value = False
+            else:
+                value = None
+
+            if tag == TYPE_TABLE and lengths[i]:
+                # Descend; the table is stored in its parent once complete
+                stack.append((table, remaining, key))
+                table = value
+                remaining = lengths[i]
+                key = _NO_KEY
+                continue
+
+            # Store the value, then climb out of every table it completes
+            while True:
+                if table is None:
+                    data.append(value)
+                    break
+                if key is _NO_KEY:
+                    key = str(value)
+                    break
+                table[key] = value
+                key = _NO_KEY
+                remaining -= 1
+                if remaining:
+                    break
+                value = table
+                table, remaining, key = stack.pop()
+        return data
+
     def parse(self) -> List[Any]:
         """Parse the entire Luabin data"""
         if len(self.buffer) == 0:
             return []
 
+        if len(self.buffer) >= NUMBA_MIN_LUABIN_SIZE and _load_scanner() is not None:
+            return self.parse_tokens()
+
         length = self.read_uint8()
         data = []
-
-        for _ in range(length):
-            type_code = self.read_uint8()
-            value = self.read_value(type_code)
-            data.append(value)
-
+        self.read_entries(data, length)
         return data
 
 
@@ -140,18 +542,18 @@ class LuabinWriter:
         self.buffer = bytearray()
 
     def write_uint8(self, value: int):
-        self.buffer.extend(struct.pack('<B', value))
+        self.buffer.append(value)
 
     def write_uint32(self, value: int):
-        self.buffer.extend(struct.pack('<I', value))
+        self.buffer += _U32.pack(value)
 
     def write_double(self, value: float):
-        self.buffer.extend(struct.pack('<d', value))
+        self.buffer += _F64.pack(value)
 
     def write_string(self, value: str):
-        encoded = value.encode('utf-8')
+        encoded = _encode(value)
         self.write_uint32(len(encoded))
-        self.buffer.extend(encoded)
+        self.buffer += encoded
 
     def write_value_data(self, type_code: int, value: Any):
         """Write value data without the type code prefix"""
@@ -270,19 +672,129 @@ class SaveFileStructure:
         ]
     }
 
+    # Value written for a field missing from the input data
+    FIELD_DEFAULTS = {
+        "int8": 0,
+        "int32": 0,
+        "int64": 0,
+        "string": "",
+        "array": [],
+        "padding": []
+    }
+
+    # id(structure) -> (structure, compiled reader, compiled writer)
+    _compiled: Dict[int, tuple] = {}
+
     @classmethod
     def get_structure(cls, is_hades_1: bool = False):
         return cls.HADES_1_STRUCTURE if is_hades_1 else cls.HADES_2_STRUCTURE
 
+    @classmethod
+    def _emit_read(cls, fields: List[Dict], target: str, lines: List[str], counter):
+        for field in fields:
+            label = repr(field["label"])
+            field_type = field["type"]
+            if field_type == "struct":
+                var = f"s{next(counter)}"
+                lines.append(f"    {var} = {{}}")
+                cls._emit_read(field.get("fields", []), var, lines, counter)
+                lines.append(f"    {target}[{label}] = {var}")
+                continue
+
+            if field_type in ("int8", "int32", "int64", "string"):
+                expr = f"self.read_{field_type}()"
+            elif field_type == "array":
+                expr = f"self.read_array({field['content']['type']!r})"
+            elif field_type == "padding":
+                expr = f"self.read_padding({field.get('size', 0)!r})"
+            else:
+                raise ValueError(f"Unknown field type: {field_type}")
+            lines.append(f"    {target}[{label}] = {expr}")
+
+    @classmethod
+    def _emit_write(cls, fields: List[Dict], source: str, lines: List[str], counter):
+        # Mirrors SaveFileWriter.write_struct, including checksum bounds
+        tracks_save_data = any(field["label"] == "version" for field in fields)
+        if tracks_save_data:
+            lines.append("    self.save_data_start = len(self.buffer)")
+            lines.append("    self._adler = 1")
+            lines.append("    self._adler_active = True")
+
+        for field in fields:
+            field_type = field["type"]
+            var = f"v{next(counter)}"
+            default = cls.FIELD_DEFAULTS.get(field_type, 0)
+            lines.append(f"    {var} = {source}.get({field['label']!r}, {default!r})")
+            if field_type == "struct":
+                cls._emit_write(field.get("fields", []), var, lines, counter)
+            elif field_type in ("int8", "int32", "int64", "string"):
+                lines.append(f"    self.write_{field_type}({var})")
+            elif field_type == "array":
+                lines.append(f"    self.write_array({var}, {field['content']['type']!r})")
+            elif field_type == "padding":
+                lines.append(f"    self.write_padding({var} if isinstance({var}, list) "
+                             f"else [0] * {field.get('size', 0)!r})")
+            else:
+                raise ValueError(f"Unknown field type: {field_type}")
+
+        if tracks_save_data:
+            lines.append("    self._adler_active = False")
+            lines.append("    self.save_data_end = len(self.buffer)")
+
+    @classmethod
+    def _compile(cls, structure: Dict) -> tuple:
+        """Generate straight-line reader/writer functions for a structure"""
+        entry = cls._compiled.get(id(structure))
+        if entry is not None:
+            return entry
+
+        counter = itertools.count()
+        read_lines = ["def read(self):", "    data = {}"]
+        cls._emit_read(structure["fields"], "data", read_lines, counter)
+        read_lines.append("    return data")
+
+        write_lines = ["def write(self, data):"]
+        cls._emit_write(structure["fields"], "data", write_lines, counter)
+
+        namespace = {}
+        source = "\n".join(read_lines + [""] + write_lines) + "\n"
+        exec(compile(source, "<save-structure>", "exec"), namespace)
+
+        entry = (structure, namespace["read"], namespace["write"])
+        cls._compiled[id(structure)] = entry
+        return entry
+
+    @classmethod
+    def compile_reader(cls, structure: Dict):
+        """Return a function reader -> dict equivalent to reading each field"""
+        return cls._compile(structure)[1]
+
+    @classmethod
+    def compile_writer(cls, structure: Dict):
+        """Return a function (writer, data) equivalent to writing each field"""
+        return cls._compile(structure)[2]
+
 
 class SaveFileReader:
     """Reads Hades save files"""
 
-    def __init__(self, buffer: bytes, is_hades_1: bool = False):
+    def __init__(self, buffer: Union[bytes, memoryview], is_hades_1: bool = False):
+        # Any buffer-protocol object; values read out of it are always copies,
+        # so the caller may release the buffer once parse() returns
         self.buffer = buffer
         self.offset = 0
         self.structure = SaveFileStructure.get_structure(is_hades_1)
         self.data = {}
+        # Field type -> reader taking (content, size, fields)
+        self._readers = {
+            "int8": lambda content, size, fields: self.read_int8(),
+            "int32": lambda content, size, fields: self.read_int32(),
+            "int64": lambda content, size, fields: self.read_int64(),
+            "string": lambda content, size, fields: self.read_string(),
+            "array": lambda content, size, fields: self.read_array(content["type"]),
+            "struct": lambda content, size, fields: self.read_struct(fields),
+            "padding": lambda content, size, fields: self.read_padding(size),
+        }
 
     def read_int8(self) -> int:
         if self.offset >= len(self.buffer):
@@ -310,15 +822,24 @@ class SaveFileReader:
         if length < 0 or length > len(self.buffer) - self.offset:
             raise ValueError(f"Invalid string length: {length}")
 
-        value = self.buffer[self.offset:self.offset + length].decode('utf-8')
+        # str() decodes straight from a memoryview slice, no bytes copy
+        value = str(self.buffer[self.offset:self.offset + length], 'utf-8')
         self.offset += length
         return value
 
-    def read_array(self, content_type: str) -> List[Any]:
+    def read_array(self, content_type: str) -> Union[List[Any], bytes]:
         length = self.read_int32()
         if length < 0 or length > 10_000_000:  # Sanity check
             raise ValueError(f"Invalid array length: {length}")
 
+        if content_type == "int8":
+            # Byte arrays (e.g. luabin) stay bytes, read as one slice
+            if self.offset + length > len(self.buffer):
+                raise ValueError("Buffer underrun: attempting to read beyond buffer")
+            array = bytes(self.buffer[self.offset:self.offset + length])
+            self.offset += length
+            return array
+
         array = []
         for _ in range(length):
             value = self.read_field(content_type)
@@ -328,9 +849,8 @@ class SaveFileReader:
     def read_padding(self, size: int) -> List[int]:
         if self.offset + size > len(self.buffer):
             raise ValueError("Buffer underrun: attempting to read beyond buffer")
-        padding = []
-        for _ in range(size):
-            padding.append(self.read_int8())
+        padding = list(self.buffer[self.offset:self.offset + size])
+        self.offset += size
         return padding
 
     def read_struct(self, fields: List[Dict]) -> Dict[str, Any]:
@@ -348,62 +868,58 @@ class SaveFileReader:
     def read_field(self, field_type: str, content: Optional[Dict] = None,
                   size: int = 0, fields: Optional[List] = None) -> Any:
         """Read a field based on its type"""
-        if field_type == "int8":
-            return self.read_int8()
-        elif field_type == "int32":
-            return self.read_int32()
-        elif field_type == "int64":
-            return self.read_int64()
-        elif field_type == "string":
-            return self.read_string()
-        elif field_type == "array":
-            return self.read_array(content["type"])
-        elif field_type == "struct":
-            return self.read_struct(fields)
-        elif field_type == "padding":
-            return self.read_padding(size)
-        else:
+        reader = self._readers.get(field_type)
+        if reader is None:
             raise ValueError(f"Unknown field type: {field_type}")
+        return reader(content, size, fields)
 
-    def decompress_luabin(self, luabin_data: List[int]) -> bytes:
+    def decompress_luabin(self, luabin_data: bytes) -> Union[bytes, bytearray]:
         """Decompress LZ4 compressed luabin data"""
         if not luabin_data:
             return b""
 
-        compressed = bytes(luabin_data)
         try:
-            # Try to decompress with reasonable size limit
-            max_size = len(compressed) * 50  # Allow up to 50x expansion
-            decompressed = lz4.block.decompress(compressed, uncompressed_size=max_size)
-            return decompressed
+            # Start with a tight output estimate and only fall back to the
+            # 50x worst case if it is too small
+            try:
+                return lz4.block.decompress(
+                    luabin_data, uncompressed_size=len(luabin_data) * 8,
+                    return_bytearray=True)
+            except lz4.block.LZ4BlockError:
+                return lz4.block.decompress(
+                    luabin_data, uncompressed_size=len(luabin_data) * 50,
+                    return_bytearray=True)
         except Exception as e:
             print(f"Warning: Failed to decompress luabin data: {e}")
             return b""
 
+    def read_header(self) -> Dict[str, Any]:
+        """Read the save structure, leaving luabin as compressed bytes"""
+        read = SaveFileStructure.compile_reader(self.structure)
+        self.data.update(read(self))
+        return self.data
+
     def parse(self) -> Dict[str, Any]:
         """Parse the entire save file"""
-        for field in self.structure["fields"]:
-            value = self.read_field(
-                field["type"],
-                field.get("content"),
-                field.get("size", 0),
-                field.get("fields", [])
-            )
-            self.data[field["label"]] = value
+        self.read_header()
 
         # Process luabin data if present
-        if ("save_data" in self.data and
-            "luabin" in self.data["save_data"] and
-            self.data["save_data"]["luabin"]):
-
+        if "save_data" in self.data and "luabin" in self.data["save_data"]:
             luabin_raw = self.data["save_data"]["luabin"]
-            try:
-                decompressed = self.decompress_luabin(luabin_raw)
-                if decompressed:
-                    reader = LuabinReader(decompressed)
-                    self.data["save_data"]["luabin"] = reader.parse()
-            except Exception as e:
-                print(f"Warning: Failed to parse luabin data: {e}")
+            luabin = None
+            if luabin_raw:
+                try:
+                    decompressed = self.decompress_luabin(luabin_raw)
+                    if decompressed:
+                        reader = LuabinReader(decompressed)
+                        luabin = reader.parse()
+                except Exception as e:
+                    print(f"Warning: Failed to parse luabin data: {e}")
+
+            # Undecodable luabin is kept as a list of ints so it stays
+            # JSON-serializable
+            self.data["save_data"]["luabin"] = (
+                luabin if luabin is not None else list(luabin_raw))
 
         return self.data
 
@@ -411,39 +927,68 @@ class SaveFileReader:
 class SaveFileWriter:
     """Writes Hades save files"""
 
-    def __init__(self, is_hades_1: bool = False):
+    def __init__(self, is_hades_1: bool = False, compression_level: int = 9):
         self.structure = SaveFileStructure.get_structure(is_hades_1)
+        # LZ4 HC level for luabin (1-12); 0 selects the fast, larger mode
+        self.compression_level = compression_level
         self.buffer = bytearray()
         self.save_data_start = 0
         self.save_data_end = 0
+        # Running Adler-32 of the save_data range, updated as bytes are emitted
+        self._adler = 1
+        self._adler_active = False
+        # Field type -> writer taking (value, content, size, fields)
+        self._writers = {
+            "int8": lambda value, content, size, fields: self.write_int8(value),
+            "int32": lambda value, content, size, fields: self.write_int32(value),
+            "int64": lambda value, content, size, fields: self.write_int64(value),
+            "string": lambda value, content, size, fields: self.write_string(value),
+            "array": lambda value, content, size, fields: self.write_array(value, content["type"]),
+            "struct": lambda value, content, size, fields: self.write_struct(value, fields),
+            "padding": lambda value, content, size, fields: self.write_padding(
+                value if isinstance(value, list) else [0] * size),
+        }
+
+    def _append(self, chunk: bytes):
+        self.buffer.extend(chunk)
+        if self._adler_active:
+            self._adler = zlib.adler32(chunk, self._adler)
 
     def write_int8(self, value: int):
-        self.buffer.extend(struct.pack('<B', int(value)))
+        self._append(struct.pack('<B', int(value)))
 
     def write_int32(self, value: int):
-        self.buffer.extend(struct.pack('<i', int(value)))
+        self._append(struct.pack('<i', int(value)))
 
     def write_int64(self, value: int):
-        self.buffer.extend(struct.pack('<Q', int(value)))
+        self._append(struct.pack('<Q', int(value)))
 
     def write_string(self, value: str):
-        encoded = str(value).encode('utf-8')
+        encoded = _encode(str(value))
         self.write_int32(len(encoded))
-        self.buffer.extend(encoded)
+        self._append(encoded)
 
-    def write_array(self, value: List[Any], content_type: str):
+    def write_array(self, value: Union[List[Any], bytes, bytearray], content_type: str):
         self.write_int32(len(value))
+        if content_type == "int8":
+            # Compressed luabin arrives as bytes and is emitted as-is; only
+            # int lists (e.g. from JSON) need packing
+            if not isinstance(value, (bytes, bytearray, memoryview)):
+                value = bytes(value)
+            self._append(value)
+            return
         for item in value:
             self.write_field(content_type, item)
 
     def write_padding(self, value: List[int]):
-        for byte_val in value:
-            self.write_int8(byte_val)
+        self._append(bytes(value))
 
     def write_struct(self, data: Dict[str, Any], fields: List[Dict]):
         # Track save_data boundaries for checksum calculation
         if any(field["label"] == "version" for field in fields):
             self.save_data_start = len(self.buffer)
+            self._adler = 1
+            self._adler_active = True
 
         for field in fields:
             field_data = data.get(field["label"], self.get_default_value(field["type"]))
@@ -456,59 +1001,38 @@ class SaveFileWriter:
             )
 
         if any(field["label"] == "version" for field in fields):
+            self._adler_active = False
             self.save_data_end = len(self.buffer)
 
     def get_default_value(self, field_type: str) -> Any:
         """Get default value for a field type"""
-        defaults = {
-            "int8": 0,
-            "int32": 0,
-            "int64": 0,
-            "string": "",
-            "array": [],
-            "padding": []
-        }
-        return defaults.get(field_type, 0)
+        return SaveFileStructure.FIELD_DEFAULTS.get(field_type, 0)
 
     def write_field(self, field_type: str, value: Any, content: Optional[Dict] = None,
                    size: int = 0, fields: Optional[List] = None):
         """Write a field based on its type"""
-        if field_type == "int8":
-            self.write_int8(value)
-        elif field_type == "int32":
-            self.write_int32(value)
-        elif field_type == "int64":
-            self.write_int64(value)
-        elif field_type == "string":
-            self.write_string(value)
-        elif field_type == "array":
-            self.write_array(value, content["type"])
-        elif field_type == "struct":
-            self.write_struct(value, fields)
-        elif field_type == "padding":
-            if isinstance(value, list):
-                self.write_padding(value)
-            else:
-                self.write_padding([0] * size)
-        else:
+        writer = self._writers.get(field_type)
+        if writer is None:
             raise ValueError(f"Unknown field type: {field_type}")
+        writer(value, content, size, fields)
 
-    def compress_luabin(self, luabin_data: List[Any]) -> List[int]:
+    def compress_luabin(self, luabin_data: List[Any]) -> bytes:
         """Compress luabin data using LZ4"""
         writer = LuabinWriter()
         uncompressed = writer.serialize(luabin_data)
 
         try:
-            # Use fastest compression for consistency
-            compressed = lz4.block.compress(uncompressed, store_size=False, compression=0)
-            return list(compressed)
+            # Saves are written once and read many times, so spend a little
+            # CPU on high-compression mode for a smaller blob to checksum,
+            # write and later decompress
+            if self.compression_level > 0:
+                return lz4.block.compress(uncompressed, mode='high_compression',
+                                          compression=self.compression_level,
+                                          store_size=False)
+            return lz4.block.compress(uncompressed, store_size=False)
         except Exception as e:
             print(f"Warning: Failed to compress luabin data: {e}")
-            return list(uncompressed)
-
-    def calculate_checksum(self, data: bytes) -> int:
-        """Calculate Adler-32 checksum"""
-        return zlib.adler32(data) & 0xffffffff
+            return uncompressed
 
     def serialize(self, data: Dict[str, Any]) -> bytes:
         """Serialize data to bytes"""
@@ -524,21 +1048,12 @@ class SaveFileWriter:
         self.ensure_required_fields(processed_data)
 
         # Write all fields
-        for field in self.structure["fields"]:
-            field_data = processed_data.get(field["label"], self.get_default_value(field["type"]))
-            self.write_field(
-                field["type"],
-                field_data,
-                field.get("content"),
-                field.get("size", 0),
-                field.get("fields", [])
-            )
+        write = SaveFileStructure.compile_writer(self.structure)
+        write(self, processed_data)
 
-        # Calculate and write checksum
+        # Write checksum, accumulated over save_data while it was emitted
         if self.save_data_start < self.save_data_end:
-            save_data_bytes = self.buffer[self.save_data_start:self.save_data_end]
-            checksum = self.calculate_checksum(save_data_bytes)
-            struct.pack_into('<I', self.buffer, 4, checksum)
+            struct.pack_into('<I', self.buffer, 4, self._adler & 0xffffffff)
 
         return bytes(self.buffer)
 
@@ -552,11 +1067,15 @@ class SaveFileWriter:
             isinstance(data["save_data"]["luabin"][0], dict)
         )
 
-    def deep_copy_with_luabin(self, data: Dict[str, Any], luabin_compressed: List[int]) -> Dict[str, Any]:
-        """Create a deep copy with compressed luabin"""
-        import copy
-        processed_data = copy.deepcopy(data)
-        processed_data["save_data"]["luabin"] = luabin_compressed
+    def deep_copy_with_luabin(self, data: Dict[str, Any], luabin_compressed: bytes) -> Dict[str, Any]:
+        """Copy data with luabin replaced by its compressed form.
+
+        Only the two dicts on the path to luabin are touched, so only those
+        are cloned; everything else is shared with the input."""
+        processed_data = dict(data)
+        save_data = dict(data["save_data"])
+        save_data["luabin"] = luabin_compressed
+        processed_data["save_data"] = save_data
         return processed_data
 
     def ensure_required_fields(self, data: Dict[str, Any]):
@@ -567,22 +1086,77 @@ class SaveFileWriter:
             data["checksum"] = [0, 0, 0, 0]  # Will be calculated
 
 
+class ValidationCache:
+    """Content hashes of save files that already passed validation"""
+
+    def __init__(self, path: Union[str, Path] = VALIDATION_CACHE_PATH):
+        self.path = Path(path)
+        self.valid = set()
+        self.dirty = False
+        try:
+            cached = json.loads(self.path.read_text(encoding='utf-8'))
+            if cached.get("schema_version") == VALIDATION_SCHEMA_VERSION:
+                self.valid = set(cached.get("valid", []))
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    @staticmethod
+    def key(buffer: Union[bytes, memoryview], is_hades_1: bool = False) -> str:
+        digest = hashlib.blake2b(buffer, digest_size=16).hexdigest()
+        return f"{'hades1' if is_hades_1 else 'hades2'}:{digest}"
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.valid
+
+    def add(self, key: str):
+        if key not in self.valid:
+            self.valid.add(key)
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix('.tmp')
+            temp_path.write_text(json.dumps({
+                "schema_version": VALIDATION_SCHEMA_VERSION,
+                "valid": sorted(self.valid),
+            }), encoding='utf-8')
+            temp_path.replace(self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Warning: Failed to save validation cache: {e}")
+
+
 class HadesSaveConverter:
     """Main class for save file conversion operations"""
 
     @staticmethod
-    def parse_save_file(file_path: Union[str, Path], is_hades_1: bool = False) -> Dict[str, Any]:
-        """Parse a save file and return data as dictionary"""
+    @contextmanager
+    def map_save_file(file_path: Union[str, Path]) -> Iterator[Union[bytes, memoryview]]:
+        """Yield a read-only view of a save file backed by the page cache.
+        Slices of it must not outlive the with block."""
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise FileNotFoundError(f"Save file not found: {file_path}")
 
-        with open(file_path, 'rb') as f:
-            buffer = f.read()
+        # mmap rejects empty files
+        if file_path.stat().st_size == 0:
+            yield b""
+            return
 
-        reader = SaveFileReader(buffer, is_hades_1)
-        return reader.parse()
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            yield view
+
+    @staticmethod
+    def parse_save_file(file_path: Union[str, Path], is_hades_1: bool = False) -> Dict[str, Any]:
+        """Parse a save file and return data as dictionary"""
+        with HadesSaveConverter.map_save_file(file_path) as buffer:
+            return SaveFileReader(buffer, is_hades_1).parse()
 
     @staticmethod
     def write_save_file(data: Dict[str, Any], file_path: Union[str, Path], is_hades_1: bool = False):
@@ -598,10 +1172,36 @@ class HadesSaveConverter:
         print(f"Written {len(binary_data)} bytes to {file_path}")
 
     @staticmethod
-    def validate_save_file(file_path: Union[str, Path], is_hades_1: bool = False) -> bool:
-        """Validate a save file by attempting to parse it"""
+    def validate_save_file(file_path: Union[str, Path], is_hades_1: bool = False,
+                           cache: Optional[ValidationCache] = None) -> bool:
+        """Validate a save file by attempting to parse it, skipping the parse
+        for content already known to be valid in `cache`"""
+        try:
+            with HadesSaveConverter.map_save_file(file_path) as buffer:
+                key = None
+                if cache is not None:
+                    key = cache.key(buffer, is_hades_1)
+                    if key in cache:
+                        # The header is enough for the summary; luabin is
+                        # neither decompressed nor decoded
+                        data = SaveFileReader(buffer, is_hades_1).read_header()
+                        print("✅ Save file validation passed (cached)")
+                        HadesSaveConverter.print_validation_summary(data["save_data"], is_hades_1)
+                        return True
+                is_valid = HadesSaveConverter.validate_save_buffer(buffer, is_hades_1)
+        except Exception as e:
+            print(f"ERROR: Validation failed: {e}")
+            return False
+
+        if is_valid and key is not None:
+            cache.add(key)
+        return is_valid
+
+    @staticmethod
+    def validate_save_buffer(buffer: Union[bytes, memoryview], is_hades_1: bool = False) -> bool:
+        """Validate save file contents given as bytes, an mmap or a memoryview"""
         try:
-            data = HadesSaveConverter.parse_save_file(file_path, is_hades_1)
+            data = SaveFileReader(buffer, is_hades_1).parse()
 
             if "save_data" not in data:
                 print("ERROR: Missing save_data section")
@@ -652,12 +1252,7 @@ class HadesSaveConverter:
                     print("WARNING: Invalid luabin structure")
 
             print("✅ Save file validation passed")
-
-            # Compact summary
-            sd = save_data
-            print(f"Format: {'Hades 1' if is_hades_1 else 'Hades 2'}, "
-                  f"Version: {sd.get('version')}, Runs: {sd.get('runs')}, "
-                  f"Location: {sd.get('location')}")
+            HadesSaveConverter.print_validation_summary(save_data, is_hades_1)
 
             return True
 
@@ -665,6 +1260,13 @@ class HadesSaveConverter:
             print(f"ERROR: Validation failed: {e}")
             return False
 
+    @staticmethod
+    def print_validation_summary(save_data: Dict[str, Any], is_hades_1: bool = False):
+        """Print the compact summary shown after a successful validation"""
+        print(f"Format: {'Hades 1' if is_hades_1 else 'Hades 2'}, "
+              f"Version: {save_data.get('version')}, Runs: {save_data.get('runs')}, "
+              f"Location: {save_data.get('location')}")
+
     @staticmethod
     def round_trip_test(file_path: Union[str, Path], is_hades_1: bool = False, keep_temp: bool = False):
         """Test round-trip conversion (sav → json → sav)"""
@@ -688,13 +1290,11 @@ class HadesSaveConverter:
 
             # Step 2: Save to JSON
             print("Step 2: Converting to JSON...")
-            with open(temp_json, 'w', encoding='utf-8') as f:
-                json.dump(original_data, f, indent=2)
+            dump_json(original_data, temp_json)
 
             # Step 3: Load from JSON and save as .sav
             print("Step 3: Converting back to .sav...")
-            with open(temp_json, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
+            loaded_data = load_json(temp_json)
 
             HadesSaveConverter.write_save_file(loaded_data, temp_sav, is_hades_1)
 
@@ -738,17 +1338,23 @@ def main():
     parse_parser.add_argument('-o', '--output', help='Output JSON file path (default: input_file.json)')
     parse_parser.add_argument('--hades1', action='store_true', help='Use Hades 1 save format (default: Hades 2)')
     parse_parser.add_argument('--indent', type=int, default=2, help='JSON indentation (default: 2)')
+    parse_parser.add_argument('-q', '--quiet', action='store_true', help='Skip the save info summary')
 
     # Build command (json to sav)
     build_parser = subparsers.add_parser('build', help='Convert JSON file to .sav')
     build_parser.add_argument('input_file', help='Path to the JSON file')
     build_parser.add_argument('-o', '--output', help='Output .sav file path (default: input_file.sav)')
     build_parser.add_argument('--hades1', action='store_true', help='Use Hades 1 save format (default: Hades 2)')
+    build_parser.add_argument('-q', '--quiet', action='store_true', help='Skip the save info summary')
+    build_parser.add_argument('--cache', action='store_true',
+                              help=f'Skip validating content that passed before (cache: {VALIDATION_CACHE_PATH})')
 
     # Validate command
     validate_parser = subparsers.add_parser('validate', help='Validate a .sav file')
     validate_parser.add_argument('input_file', help='Path to the .sav file')
     validate_parser.add_argument('--hades1', action='store_true', help='Use Hades 1 save format (default: Hades 2)')
+    validate_parser.add_argument('--cache', action='store_true',
+                                 help=f'Skip validating content that passed before (cache: {VALIDATION_CACHE_PATH})')
 
     # Test command (round-trip)
     test_parser = subparsers.add_parser('test', help='Test round-trip conversion (sav→json→sav)')
@@ -764,6 +1370,8 @@ def main():
 
     input_path = Path(args.input_file)
     is_hades_1 = args.hades1
+    # The summary is for people; skip it in pipelines and batch runs
+    show_info = sys.stdout.isatty() and not getattr(args, 'quiet', False)
 
     try:
         if args.command == 'parse':
@@ -774,13 +1382,12 @@ def main():
             save_data = HadesSaveConverter.parse_save_file(input_path, is_hades_1)
 
             print(f"Writing JSON to: {output_path}")
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=args.indent, ensure_ascii=False)
+            dump_json(save_data, output_path, args.indent)
 
             print("Conversion completed successfully!")
 
             # Print basic info
-            if 'save_data' in save_data:
+            if show_info and 'save_data' in save_data:
                 sd = save_data['save_data']
                 print(f"\nSave Info:")
                 print(f"  Format: {'Hades 1' if is_hades_1 else 'Hades 2'}")
@@ -795,8 +1402,7 @@ def main():
             output_path = Path(args.output) if args.output else input_path.with_suffix('.sav')
 
             print(f"Loading JSON file: {input_path}")
-            with open(input_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            save_data = load_json(input_path)
 
             print(f"Building save file: {output_path}")
             HadesSaveConverter.write_save_file(save_data, output_path, is_hades_1)
@@ -805,10 +1411,13 @@ def main():
 
             # Validate the created file
             print("Validating created save file...")
-            HadesSaveConverter.validate_save_file(output_path, is_hades_1)
+            cache = ValidationCache() if args.cache else None
+            HadesSaveConverter.validate_save_file(output_path, is_hades_1, cache)
+            if cache is not None:
+                cache.save()
 
             # Print basic info
-            if 'save_data' in save_data:
+            if show_info and 'save_data' in save_data:
                 sd = save_data['save_data']
                 print(f"\nSave Info:")
                 print(f"  Format: {'Hades 1' if is_hades_1 else 'Hades 2'}")
@@ -819,7 +1428,10 @@ def main():
         elif args.command == 'validate':
             # Validate a save file
             print(f"Validating save file: {input_path}")
-            is_valid = HadesSaveConverter.validate_save_file(input_path, is_hades_1)
+            cache = ValidationCache() if args.cache else None
+            is_valid = HadesSaveConverter.validate_save_file(input_path, is_hades_1, cache)
+            if cache is not None:
+                cache.save()
             if not is_valid:
                 return 1
 
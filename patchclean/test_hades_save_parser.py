@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Round-trip tests for hades_save_parser"""
+
+import math
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import hades_save_parser
+from hades_save_parser import HadesSaveConverter, LuabinReader, LuabinWriter, dump_json, load_json
+
+
+def make_save(luabin):
+    return {
+        "signature": [83, 65, 86, 69],
+        "checksum": [0, 0, 0, 0],
+        "save_data": {
+            "version": 17,
+            "timestamp": 1234567890123,
+            "location": "Tartarus",
+            "runs": 5,
+            "padding1": [0] * 8,
+            "grasp": 10,
+            "prestige": 2,
+            "god_mode_enabled": 0,
+            "hell_mode_enabled": 1,
+            "lua_keys": ["CurrentRun"],
+            "current_map_name": "RoomA",
+            "start_next_map": "RoomB",
+            "luabin": luabin,
+        },
+    }
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def test_non_finite_numbers_survive_json(self):
+        luabin = [{"CurrentRun": {
+            "Inf": math.inf,
+            "NegInf": -math.inf,
+            "NaN": math.nan,
+            "Finite": 1.5,
+        }}]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_dir = Path(temp_dir)
+            HadesSaveConverter.write_save_file(make_save(luabin), temp_dir / "in.sav")
+
+            # sav -> json -> sav, as the test command does
+            parsed = HadesSaveConverter.parse_save_file(temp_dir / "in.sav")
+            dump_json(parsed, temp_dir / "save.json")
+            HadesSaveConverter.write_save_file(load_json(temp_dir / "save.json"), temp_dir / "out.sav")
+            result = HadesSaveConverter.parse_save_file(temp_dir / "out.sav")
+
+        run = result["save_data"]["luabin"][0]["CurrentRun"]
+        self.assertEqual(run["Inf"], math.inf)
+        self.assertEqual(run["NegInf"], -math.inf)
+        self.assertTrue(math.isnan(run["NaN"]))
+        self.assertEqual(run["Finite"], 1.5)
+
+
+class LuabinScannerTest(unittest.TestCase):
+    """The numba token scanner only runs on very large luabin, so force it"""
+
+    def setUp(self):
+        if hades_save_parser._load_scanner() is None:
+            self.skipTest("numba is not installed")
+
+    def parse(self, buffer, min_size):
+        with mock.patch.object(hades_save_parser, "NUMBA_MIN_LUABIN_SIZE", min_size):
+            return LuabinReader(buffer).parse()
+
+    def test_scanner_matches_read_entries(self):
+        luabin = [{
+            "CurrentRun": {
+                "Name": "Zagreus \u00e9\u65e5",
+                "Depth": 12.0,
+                "Negative": -3.25,
+                "Inf": math.inf,
+                "Enabled": True,
+                "Disabled": False,
+                "Empty": {},
+                "1": "first", "2": {"Nested": {"Deeper": {"1": 1.0, "2": 2.0}}}, "10": 0.5,
+            },
+            "GameState": {str(i): {"Value": float(i), "Tag": f"t{i}"} for i in range(1, 200)},
+        }, "tail", 7.0]
+        buffer = LuabinWriter().serialize(luabin)
+
+        # MIN_SIZE 0 always takes the scanner, a huge one never does
+        scanned = self.parse(buffer, 0)
+        expected = self.parse(buffer, 1 << 62)
+        self.assertEqual(repr(scanned), repr(expected))
+
+    def test_scanner_rejects_truncated_input(self):
+        buffer = LuabinWriter().serialize([{"CurrentRun": {"Name": "Zagreus", "Depth": 1.0}}])
+        for min_size in (0, 1 << 62):
+            with self.assertRaises(ValueError):
+                self.parse(buffer[:-3], min_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
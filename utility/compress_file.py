@@ -32,7 +32,8 @@ import tempfile
 import xml.etree.ElementTree as ET
 import zipfile
 import gzip
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
 from datetime import datetime
 
@@ -55,9 +56,13 @@ except ImportError:
 # --- CONFIGURATION ---
 DEFAULT_JPG_QUALITY = 80
 PNG_COMPRESS_LEVEL = 9
+AVIF_QUALITY = 50
+AVIF_SPEED = 6  # libavif encoder speed 0-10 (0 = slowest/smallest)
 # Minimum savings threshold (percentage) to keep compressed version
 PDF_SAVINGS_THRESHOLD = 0.05    # 5% for PDFs
 ARCHIVE_SAVINGS_THRESHOLD = 0.03  # 3% for EPUB/CBZ/CBR
+# Upper bound on tasks sent to a worker per IPC round-trip
+MAX_CHUNKSIZE = 32
 LOG_FILE = "compression_log.txt"
 
 # File type groups
@@ -106,6 +111,64 @@ def setup_output_path(source_file, source_root, output_root):
     return out_path
 
 
+_clonefile = None
+
+
+def _macos_clonefile(src, dst):
+    """Clone src to dst with clonefile(2) on APFS. Returns True on success."""
+    global _clonefile
+    if _clonefile is None:
+        import ctypes
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            _clonefile = libc.clonefile
+            _clonefile.argtypes = (ctypes.c_char_p, ctypes.c_char_p,
+                                   ctypes.c_uint32)
+            _clonefile.restype = ctypes.c_int
+        except (OSError, AttributeError):
+            _clonefile = False
+    if not _clonefile:
+        return False
+    # clonefile refuses to overwrite an existing destination
+    if os.path.lexists(dst):
+        os.remove(dst)
+    return _clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+
+def _linux_copy_file_range(src, dst):
+    """Copy with copy_file_range(2), which reflinks on Btrfs/XFS.
+    Returns True on success."""
+    with open(src, 'rb') as f_in, open(dst, 'wb') as f_out:
+        remaining = os.fstat(f_in.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(f_in.fileno(), f_out.fileno(),
+                                        remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    return remaining == 0
+
+
+def copy_file(src, dst):
+    """Drop-in for shutil.copy2 that prefers a copy-on-write clone.
+
+    On APFS (clonefile) and Btrfs/XFS (copy_file_range) the copy is a
+    metadata-only operation; everywhere else it falls back to copy2."""
+    try:
+        if sys.platform == 'darwin':
+            cloned = _macos_clonefile(src, dst)
+        elif hasattr(os, 'copy_file_range'):
+            cloned = _linux_copy_file_range(src, dst)
+        else:
+            cloned = False
+    except OSError:
+        cloned = False
+    if not cloned:
+        return shutil.copy2(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+
 # --- IMAGE HELPERS ---
 
 def _open_pillow():
@@ -151,7 +214,8 @@ def optimize_image_bytes(data, filename):
 
 # --- COMPRESSION WORKERS ---
 
-def compress_image(source_path, output_path, use_avif, dry_run, copy_mode):
+def compress_image(source_path, output_path, use_avif, dry_run, copy_mode,
+                   keep_metadata=False, avif_threads=1):
     """Compress a standalone image file."""
     Image = _open_pillow()
     try:
@@ -162,13 +226,20 @@ def compress_image(source_path, output_path, use_avif, dry_run, copy_mode):
 
         with Image.open(source_path) as img:
             if use_avif:
+                # EXIF (orientation) and ICC (colour space) always carry over
+                # to AVIF; Pillow's own AVIF plugin does not take EXIF from
+                # img.info the way pillow-avif did, so pass both explicitly
                 new_path = os.path.splitext(
                     output_path if copy_mode else source_path)[0] + ".avif"
-                if not copy_mode:
-                    shutil.copy2(source_path, output_path)  # backup
-                img.save(new_path, format="AVIF", quality=50, method=6)
+                if not copy_mode and new_path == source_path:
+                    copy_file(source_path, output_path)  # backup
+                img.save(new_path, format="AVIF", quality=AVIF_QUALITY,
+                         speed=AVIF_SPEED, max_threads=avif_threads,
+                         range="full", exif=img.info.get("exif", b""),
+                         icc_profile=img.info.get("icc_profile"))
                 if not copy_mode and new_path != source_path:
-                    os.remove(source_path)
+                    # Original is left untouched, so backing it up is a rename
+                    shutil.move(source_path, output_path)
                 return (True, orig_size, get_file_size(new_path),
                         f"AVIF: {source_path}")
 
@@ -177,7 +248,19 @@ def compress_image(source_path, output_path, use_avif, dry_run, copy_mode):
             if orig_format == "JPG":
                 orig_format = "JPEG"
 
-            save_params = {"format": orig_format, "optimize": True}
+            # Pass EXIF/ICC through (or blank them) as raw bytes rather than
+            # rebuilding the image from its pixel data
+            if keep_metadata:
+                meta_params = {"exif": img.info.get("exif", b""),
+                               "icc_profile": img.info.get("icc_profile")}
+            else:
+                meta_params = {"exif": b"", "icc_profile": None}
+                # Savers fall back to img.info for these (JPEG COM, XMP)
+                for key in ("comment", "xmp"):
+                    img.info.pop(key, None)
+
+            save_params = {"format": orig_format, "optimize": True,
+                           **meta_params}
             if orig_format == "JPEG":
                 orig_q = img.info.get("quality", DEFAULT_JPG_QUALITY)
                 save_params["quality"] = min(DEFAULT_JPG_QUALITY, orig_q)
@@ -185,28 +268,26 @@ def compress_image(source_path, output_path, use_avif, dry_run, copy_mode):
             elif orig_format == "PNG":
                 save_params["compress_level"] = PNG_COMPRESS_LEVEL
 
-            # Strip metadata by rebuilding pixel data
-            data = list(img.getdata())
-            clean_img = Image.new(img.mode, img.size)
-            clean_img.putdata(data)
+            # Decode fully before the source may be overwritten in place
+            img.load()
 
             if copy_mode:
-                clean_img.save(output_path, **save_params)
+                img.save(output_path, **save_params)
             else:
-                shutil.copy2(source_path, output_path)  # backup
-                clean_img.save(source_path, **save_params)
+                copy_file(source_path, output_path)  # backup
+                img.save(source_path, **save_params)
 
         dest = output_path if copy_mode else source_path
         new_size = get_file_size(dest)
         # If no savings in copy mode, use original
         if copy_mode and new_size >= orig_size:
-            shutil.copy2(source_path, output_path)
+            copy_file(source_path, output_path)
             new_size = orig_size
         return True, orig_size, new_size, f"Image: {source_path}"
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL image {source_path}: {e}"
@@ -219,7 +300,7 @@ def compress_pdf_pikepdf(source_path, output_path, dry_run, copy_mode):
     except ImportError:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL PDF {source_path}: pikepdf not installed"
@@ -229,27 +310,31 @@ def compress_pdf_pikepdf(source_path, output_path, dry_run, copy_mode):
             return True, orig_size, orig_size * 0.9, f"PDF/pikepdf (est): {source_path}"
 
         temp_pdf = source_path + ".tmp"
-        with pikepdf.Pdf.open(source_path) as pdf:
-            pdf.save(temp_pdf, compress_streams=True, linearize=True)
+        # mmap the input instead of buffering it; only streams are
+        # re-deflated, so skip content normalization and metadata fixups
+        with pikepdf.Pdf.open(source_path,
+                              access_mode=pikepdf.AccessMode.mmap) as pdf:
+            pdf.save(temp_pdf, compress_streams=True, linearize=True,
+                     normalize_content=False, fix_metadata_version=False)
 
         new_size = get_file_size(temp_pdf)
         if new_size < orig_size * (1 - PDF_SAVINGS_THRESHOLD):
             if copy_mode:
                 shutil.move(temp_pdf, output_path)
             else:
-                shutil.copy2(source_path, output_path)  # backup
+                copy_file(source_path, output_path)  # backup
                 shutil.move(temp_pdf, source_path)
             dest = output_path if copy_mode else source_path
             return True, orig_size, get_file_size(dest), f"PDF/pikepdf: {source_path}"
         else:
             os.remove(temp_pdf)
             if copy_mode:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             return True, orig_size, orig_size, f"PDF/pikepdf (no savings): {source_path}"
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL PDF {source_path}: {e}"
@@ -291,14 +376,14 @@ def compress_pdf_ghostscript(source_path, output_path, dry_run, copy_mode):
             if copy_mode:
                 shutil.move(tmp_path, output_path)
             else:
-                shutil.copy2(source_path, output_path)  # backup
+                copy_file(source_path, output_path)  # backup
                 shutil.move(tmp_path, source_path)
             dest = output_path if copy_mode else source_path
             return True, orig_size, get_file_size(dest), f"PDF/gs: {source_path}"
         else:
             os.unlink(tmp_path)
             if copy_mode:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             return True, orig_size, orig_size, f"PDF/gs (no savings): {source_path}"
     except FileNotFoundError:
         # Ghostscript not installed, fall back to pikepdf
@@ -306,7 +391,7 @@ def compress_pdf_ghostscript(source_path, output_path, dry_run, copy_mode):
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL PDF/gs {source_path}: {e}"
@@ -380,7 +465,7 @@ def compress_epub(source_path, output_path, dry_run, copy_mode):
             if copy_mode:
                 shutil.move(temp_path, output_path)
             else:
-                shutil.copy2(source_path, output_path)  # backup
+                copy_file(source_path, output_path)  # backup
                 shutil.move(temp_path, source_path)
             dest = output_path if copy_mode else source_path
             return (True, orig_size, get_file_size(dest),
@@ -388,13 +473,13 @@ def compress_epub(source_path, output_path, dry_run, copy_mode):
         else:
             os.remove(temp_path)
             if copy_mode:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             return (True, orig_size, orig_size,
                     f"EPUB (no savings): {source_path}")
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL EPUB {source_path}: {e}"
@@ -418,20 +503,20 @@ def compress_cbz(source_path, output_path, dry_run, copy_mode):
             if copy_mode:
                 shutil.move(temp_path, output_path)
             else:
-                shutil.copy2(source_path, output_path)  # backup
+                copy_file(source_path, output_path)  # backup
                 shutil.move(temp_path, source_path)
             dest = output_path if copy_mode else source_path
             return True, orig_size, get_file_size(dest), f"CBZ: {source_path}"
         else:
             os.remove(temp_path)
             if copy_mode:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             return (True, orig_size, orig_size,
                     f"CBZ (no savings): {source_path}")
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL CBZ {source_path}: {e}"
@@ -489,7 +574,7 @@ def compress_cbr(source_path, output_path, dry_run, copy_mode):
             else:
                 # backup original .cbr
                 backup_path = os.path.splitext(output_path)[0] + '.cbr'
-                shutil.copy2(source_path, backup_path)
+                copy_file(source_path, backup_path)
                 # Place new .cbz next to original
                 new_cbz = os.path.splitext(source_path)[0] + '.cbz'
                 shutil.move(temp_cbz, new_cbz)
@@ -499,14 +584,14 @@ def compress_cbr(source_path, output_path, dry_run, copy_mode):
         else:
             os.remove(temp_cbz)
             if copy_mode:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             return (True, orig_size, orig_size,
                     f"CBR (no savings): {source_path}")
     except Exception as e:
         if copy_mode:
             try:
                 cbr_out = os.path.splitext(output_path)[0] + '.cbr'
-                shutil.copy2(source_path, cbr_out)
+                copy_file(source_path, cbr_out)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL CBR {source_path}: {e}"
@@ -556,7 +641,7 @@ def _compress_cbr_7z(source_path, output_path, dry_run, copy_mode):
                     shutil.move(temp_cbz, output_path)
                 else:
                     backup_path = os.path.splitext(output_path)[0] + '.cbr'
-                    shutil.copy2(source_path, backup_path)
+                    copy_file(source_path, backup_path)
                     new_cbz = os.path.splitext(source_path)[0] + '.cbz'
                     shutil.move(temp_cbz, new_cbz)
                     os.remove(source_path)
@@ -564,21 +649,21 @@ def _compress_cbr_7z(source_path, output_path, dry_run, copy_mode):
             else:
                 os.remove(temp_cbz)
                 if copy_mode:
-                    shutil.copy2(source_path, output_path)
+                    copy_file(source_path, output_path)
                 return True, orig_size, orig_size, f"CBR/7z (no savings): {source_path}"
         finally:
             shutil.rmtree(tmpdir, ignore_errors=True)
     except FileNotFoundError:
         if copy_mode:
             try:
-                shutil.copy2(source_path, os.path.splitext(output_path)[0] + '.cbr')
+                copy_file(source_path, os.path.splitext(output_path)[0] + '.cbr')
             except Exception:
                 pass
         return False, 0, 0, f"FAIL CBR {source_path}: neither rarfile nor 7z available"
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, os.path.splitext(output_path)[0] + '.cbr')
+                copy_file(source_path, os.path.splitext(output_path)[0] + '.cbr')
             except Exception:
                 pass
         return False, 0, 0, f"FAIL CBR/7z {source_path}: {e}"
@@ -603,19 +688,19 @@ def repack_zip_format(source_path, output_path, dry_run, copy_mode):
             if copy_mode:
                 shutil.move(temp_path, output_path)
             else:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
                 shutil.move(temp_path, source_path)
             dest = output_path if copy_mode else source_path
             return True, orig_size, get_file_size(dest), f"ZIP repack: {source_path}"
         else:
             os.remove(temp_path)
             if copy_mode:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             return True, orig_size, orig_size, f"ZIP repack (no savings): {source_path}"
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL ZIP {source_path}: {e}"
@@ -643,7 +728,7 @@ def minify_text_file(source_path, output_path, file_ext, dry_run, copy_mode):
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(content)
         else:
-            shutil.copy2(source_path, output_path)
+            copy_file(source_path, output_path)
             with open(source_path, 'w', encoding='utf-8') as f:
                 f.write(content)
 
@@ -652,7 +737,7 @@ def minify_text_file(source_path, output_path, file_ext, dry_run, copy_mode):
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL minify {source_path}: {e}"
@@ -680,7 +765,7 @@ def compress_svg(source_path, output_path, dry_run, copy_mode):
     except Exception as e:
         if copy_mode:
             try:
-                shutil.copy2(source_path, output_path)
+                copy_file(source_path, output_path)
             except Exception:
                 pass
         return False, 0, 0, f"FAIL SVG {source_path}: {e}"
@@ -688,35 +773,54 @@ def compress_svg(source_path, output_path, dry_run, copy_mode):
 
 # --- DISPATCHER ---
 
+TaskOptions = namedtuple('TaskOptions', [
+    'use_avif', 'use_gs', 'dry_run', 'copy_mode', 'keep_metadata',
+    'avif_threads'])
+
+
+def _image_task(file_path, output_path, file_ext, opts):
+    return compress_image(file_path, output_path, opts.use_avif,
+                          opts.dry_run, opts.copy_mode, opts.keep_metadata,
+                          opts.avif_threads)
+
+
+def _pdf_task(file_path, output_path, file_ext, opts):
+    compress = (compress_pdf_ghostscript if opts.use_gs
+                else compress_pdf_pikepdf)
+    return compress(file_path, output_path, opts.dry_run, opts.copy_mode)
+
+
+def _minify_task(file_path, output_path, file_ext, opts):
+    return minify_text_file(file_path, output_path, file_ext, opts.dry_run,
+                            opts.copy_mode)
+
+
+def _simple_task(compress):
+    """Adapt a compress_*(src, out, dry_run, copy_mode) worker to a handler."""
+    def handler(file_path, output_path, file_ext, opts):
+        return compress(file_path, output_path, opts.dry_run, opts.copy_mode)
+    return handler
+
+
+EXT_HANDLERS = {
+    **dict.fromkeys(IMAGE_EXTS, _image_task),
+    **dict.fromkeys(PDF_EXTS, _pdf_task),
+    '.epub': _simple_task(compress_epub),
+    '.cbz': _simple_task(compress_cbz),
+    **dict.fromkeys(CBR_EXTS, _simple_task(compress_cbr)),
+    **dict.fromkeys(OFFICE_EXTS, _simple_task(repack_zip_format)),
+    **dict.fromkeys(SVG_EXTS, _simple_task(compress_svg)),
+    **dict.fromkeys(TEXT_MINIFY_EXTS, _minify_task),
+}
+
+
 def process_file_task(task_args):
-    (file_path, source_root, output_root, file_ext,
-     use_avif, use_gs, dry_run, copy_mode) = task_args
+    file_path, source_root, output_root, file_ext, opts = task_args
+    handler = EXT_HANDLERS.get(file_ext)
+    if handler is None:
+        return False, 0, 0, f"Unknown type: {file_path}"
     output_path = setup_output_path(file_path, source_root, output_root)
-
-    if file_ext in IMAGE_EXTS:
-        return compress_image(file_path, output_path, use_avif, dry_run,
-                              copy_mode)
-    elif file_ext in PDF_EXTS:
-        if use_gs:
-            return compress_pdf_ghostscript(file_path, output_path, dry_run,
-                                            copy_mode)
-        else:
-            return compress_pdf_pikepdf(file_path, output_path, dry_run,
-                                        copy_mode)
-    elif file_ext == '.epub':
-        return compress_epub(file_path, output_path, dry_run, copy_mode)
-    elif file_ext == '.cbz':
-        return compress_cbz(file_path, output_path, dry_run, copy_mode)
-    elif file_ext in CBR_EXTS:
-        return compress_cbr(file_path, output_path, dry_run, copy_mode)
-    elif file_ext in OFFICE_EXTS:
-        return repack_zip_format(file_path, output_path, dry_run, copy_mode)
-    elif file_ext in SVG_EXTS:
-        return compress_svg(file_path, output_path, dry_run, copy_mode)
-    elif file_ext in TEXT_MINIFY_EXTS:
-        return minify_text_file(file_path, output_path, file_ext, dry_run,
-                                copy_mode)
-    return False, 0, 0, f"Unknown type: {file_path}"
+    return handler(file_path, output_path, file_ext, opts)
 
 
 # --- MAIN ---
@@ -737,6 +841,10 @@ def main():
                              "requires gs installed).")
     parser.add_argument("--avif", action="store_true",
                         help="Convert images to AVIF format.")
+    parser.add_argument("--keep-metadata", action="store_true",
+                        help="Keep EXIF and ICC profiles when recompressing "
+                             "standalone images (stripped by default; AVIF "
+                             "conversion always keeps them).")
     parser.add_argument("--dry-run", action="store_true",
                         help="Estimate savings without modifying files.")
     parser.add_argument("--workers", type=int,
@@ -770,6 +878,11 @@ def main():
         print("DRY RUN — no files will be modified")
     print()
 
+    # Let libavif thread within each image while the pool spreads files
+    avif_threads = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+    opts = TaskOptions(args.avif, args.gs, args.dry_run, args.copy_mode,
+                       args.keep_metadata, avif_threads)
+
     user_excludes = set(args.exclude)
     abs_excludes = {os.path.abspath(os.path.join(source_root, x))
                     for x in user_excludes}
@@ -789,12 +902,13 @@ def main():
         dirs[:] = filtered
 
         for fname in files:
-            file_ext = os.path.splitext(fname)[1].lower()
+            # Cheaper than splitext; leading-dot names have no extension
+            stem, _, ext = fname.rpartition('.')
+            file_ext = '.' + ext.lower() if stem else ''
             full_path = os.path.join(root, fname)
             if file_ext in ALL_TARGET_EXTS:
                 tasks.append((full_path, source_root, output_root, file_ext,
-                              args.avif, args.gs, args.dry_run,
-                              args.copy_mode))
+                              opts))
             elif args.copy_mode and args.copy_other:
                 other_files.append(full_path)
 
@@ -812,16 +926,26 @@ def main():
         print("No target files found.")
         return
 
+    # Largest files first so a big PDF doesn't end up alone at the tail
+    tasks.sort(key=lambda t: get_file_size(t[0]), reverse=True)
+
     ctx = multiprocessing.get_context('spawn')
     total_old, total_new, success_count, fail_count = 0, 0, 0, 0
 
     with ProcessPoolExecutor(max_workers=args.workers,
                              mp_context=ctx) as executor:
-        futures = [executor.submit(process_file_task, t) for t in tasks]
+        chunksize = max(1, min(MAX_CHUNKSIZE,
+                               len(tasks) // (args.workers * 4)))
+        # map() cuts consecutive runs into chunks, so deal the largest-first
+        # list out round-robin: each chunk then spans the whole size range
+        # and the first one still starts with the largest file
+        n_chunks = -(-len(tasks) // chunksize)
+        tasks = [t for i in range(n_chunks) for t in tasks[i::n_chunks]]
+        results = executor.map(process_file_task, tasks,
+                               chunksize=chunksize)
 
         with tqdm(total=len(tasks), desc="Compressing", unit="file") as pbar:
-            for future in as_completed(futures):
-                success, old_sz, new_sz, log_msg = future.result()
+            for success, old_sz, new_sz, log_msg in results:
                 write_log(log_msg)
                 if success:
                     success_count += 1
@@ -837,7 +961,7 @@ def main():
         for fp in other_files:
             dest = setup_output_path(fp, source_root, output_root)
             if not os.path.exists(dest):
-                shutil.copy2(fp, dest)
+                copy_file(fp, dest)
 
     # Summary
     saved = total_old - total_new
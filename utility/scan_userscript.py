@@ -7,15 +7,113 @@ import os
 import re
 import sys
 import json
+import mmap
 import argparse
+import bisect
 from urllib.request import urlopen
-from urllib.parse import urlparse
 import logging
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class ReplaceWithFunctionPattern:
+    """Finds the same matches as re.finditer with `pattern`, in linear time.
+
+    re backtracks `[^)]*` to every comma in the call and rescans the rest of
+    the line from each one, and does it again for every later .replace( in
+    the same unclosed call, which is quadratic on hostile input. Here the
+    commas are walked right to left as re would, each one only searching the
+    part of its line the comma to its right has not, and a call is skipped
+    when an earlier one already ruled out every comma it can reach. The
+    winning match is then confirmed by the regex itself, cut off at its end.
+    """
+
+    pattern = r"\.replace\s*\([^)]*,(.*?function|\{)"
+
+    def __init__(self):
+        self.regex = re.compile(self.pattern)
+        self.call = re.compile(r"\.replace\s*\(")
+
+    @staticmethod
+    def forward_find(string, sub):
+        """str.find for start positions that never decrease; a result is
+        reused until a search starts past it"""
+        start, found = len(string) + 1, -1
+
+        def find(pos):
+            nonlocal start, found
+            if pos < start or pos > found >= 0:
+                start, found = pos, string.find(sub, pos)
+            return found
+
+        return find
+
+    @staticmethod
+    def match_end(string, args_start, args_end, find_newline, find_function):
+        """End of the match whose arguments span args_start:args_end, or None"""
+        comma = string.rfind(',', args_start, args_end)
+        if comma == -1:
+            return None
+
+        # The last comma's line can run far past the call, so its searches
+        # go through the shared finders
+        line_end = find_newline(comma)
+        if line_end == -1:
+            line_end = len(string)
+        found = find_function(comma + 1)
+
+        while True:
+            if found != -1 and found < line_end:
+                return found + len('function')
+            if string.startswith('{', comma + 1):
+                return comma + 2
+
+            previous = string.rfind(',', args_start, comma)
+            if previous == -1:
+                return None
+            if string.rfind('\n', previous, comma) != -1:
+                line_end = string.find('\n', previous)
+                search_end = line_end
+            else:
+                # Only a "function" starting before this comma is left to find
+                search_end = min(comma + len('function'), line_end)
+            comma = previous
+            found = string.find('function', comma + 1, search_end)
+
+    def finditer(self, string):
+        find_paren = self.forward_find(string, ')')
+        find_newline = self.forward_find(string, '\n')
+        find_function = self.forward_find(string, 'function')
+
+        pos = 0
+        last_args_end = None
+        while True:
+            call = self.call.search(string, pos)
+            if call is None:
+                return
+            args_end = find_paren(call.end())
+            if args_end == -1:
+                args_end = len(string)
+
+            # A call sharing its closing paren with the previous one can only
+            # reach commas that call already ruled out
+            end = None
+            if args_end != last_args_end:
+                last_args_end = args_end
+                end = self.match_end(string, call.end(), args_end, find_newline, find_function)
+            if end is None:
+                pos = call.start() + 1
+                continue
+            yield self.regex.match(string, call.start(), end)
+            pos = end
+
+
 class TampermonkeyScanner:
     def __init__(self, risk_threshold=5):
         self.risk_threshold = risk_threshold
@@ -71,12 +169,36 @@ class TampermonkeyScanner:
             {"pattern": r"@grant\s+unsafeWindow", "name": "Unsafe window access", "risk": 8, 
              "description": "Requests access to page JavaScript context, high risk for compromising page security"}
         ]
+
+        # Compile each pattern once rather than per scan
+        for pattern in self.suspicious_patterns:
+            pattern["regex"] = re.compile(pattern["pattern"])
+            if pattern["pattern"] == ReplaceWithFunctionPattern.pattern:
+                pattern["regex"] = ReplaceWithFunctionPattern()
+
+        # With hyperscan, one multi-pattern DFA pass tells which patterns
+        # occur at all, and only those are re-run with re for exact matches.
+        # Prefilter mode approximates what hyperscan can't express (e.g.
+        # lookbehind) without ever missing a match.
+        self.hyperscan_db = None
+        if hyperscan is not None:
+            try:
+                database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                database.compile(
+                    expressions=[p["pattern"].encode('utf-8') for p in self.suspicious_patterns],
+                    ids=list(range(len(self.suspicious_patterns))),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER |
+                           hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(self.suspicious_patterns))
+                self.hyperscan_db = database
+            except Exception as e:
+                logger.warning(f"Hyperscan unavailable, scanning with re only: {e}")
         
-        # External URL patterns
-        self.external_url_pattern = re.compile(r'(https?://[^\s\'"]+)')
+        # External URL patterns; group 2 is the netloc, as urlparse would
+        # split it, so hosts come out of the same pass that finds the URLs
+        self.external_url_pattern = re.compile(r'(https?://(?=[^\s\'"])([^\s\'"/?#]*)[^\s\'"]*)')
         
         # Known good CDNs
-        self.good_cdns = [
+        self.good_cdns = frozenset({
             'cdn.jsdelivr.net',
             'cdnjs.cloudflare.com',
             'unpkg.com',
@@ -84,13 +206,23 @@ class TampermonkeyScanner:
             'ajax.googleapis.com',
             'maxcdn.bootstrapcdn.com',
             'stackpath.bootstrapcdn.com'
-        ]
+        })
 
     def load_script_from_file(self, file_path):
         """Load a userscript from a file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            with open(file_path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return ""
+                # Decode straight from the page cache rather than through a
+                # heap copy of the raw bytes
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    has_cr = mm.find(b'\r') != -1
+                    script_content = str(mm, 'utf-8')
+            if has_cr:
+                # Same universal-newline handling as a text-mode read
+                script_content = script_content.replace('\r\n', '\n').replace('\r', '\n')
+            return script_content
         except Exception as e:
             logger.error(f"Error loading file {file_path}: {e}")
             return None
@@ -119,6 +251,23 @@ class TampermonkeyScanner:
         
         return metadata
 
+    def candidate_patterns(self, script_content):
+        """Patterns that may match the script; all of them without hyperscan"""
+        if self.hyperscan_db is None:
+            return self.suspicious_patterns
+
+        present = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            present.add(pattern_id)
+
+        try:
+            self.hyperscan_db.scan(script_content.encode('utf-8'), match_event_handler=on_match)
+        except Exception as e:
+            logger.warning(f"Hyperscan scan failed, scanning with re only: {e}")
+            return self.suspicious_patterns
+        return [p for i, p in enumerate(self.suspicious_patterns) if i in present]
+
     def scan_script(self, script_content):
         """Scan a script for suspicious patterns"""
         if not script_content:
@@ -130,14 +279,21 @@ class TampermonkeyScanner:
         # Find all suspicious patterns
         findings = []
         total_risk_score = 0
+
+        # Line numbers come from a binary search over newline offsets
+        # instead of re-counting the script prefix for every match
+        newline_offsets = [m.start() for m in re.finditer('\n', script_content)]
         
-        for pattern in self.suspicious_patterns:
-            matches = re.finditer(pattern["pattern"], script_content)
+        for pattern in self.candidate_patterns(script_content):
+            matches = pattern["regex"].finditer(script_content)
             for match in matches:
-                line_number = script_content[:match.start()].count('\n') + 1
+                line_number = bisect.bisect_left(newline_offsets, match.start()) + 1
                 context_start = max(0, match.start() - 40)
                 context_end = min(len(script_content), match.end() + 40)
-                context = script_content[context_start:context_end].strip()
+                raw_context = script_content[context_start:context_end]
+                context = raw_context.strip()
+                # Where the match sits in the stripped context, known exactly here
+                leading = len(raw_context) - len(raw_context.lstrip())
                 
                 findings.append({
                     "pattern_name": pattern["name"],
@@ -145,17 +301,17 @@ class TampermonkeyScanner:
                     "description": pattern["description"],
                     "line": line_number,
                     "match": match.group(0),
-                    "context": context
+                    "context": context,
+                    "match_offset_in_context": match.start() - context_start - leading
                 })
                 total_risk_score += pattern["risk"]
         
         # Extract and check external URLs
-        external_urls = self.external_url_pattern.findall(script_content)
         suspicious_urls = []
         
-        for url in external_urls:
-            parsed_url = urlparse(url)
-            if parsed_url.netloc and parsed_url.netloc not in self.good_cdns:
+        for match in self.external_url_pattern.finditer(script_content):
+            url, netloc = match.group(1, 2)
+            if netloc and netloc not in self.good_cdns:
                 suspicious_urls.append(url)
         
         # Check for script size and complexity
@@ -183,44 +339,43 @@ class TampermonkeyScanner:
             "malicious_likelihood": malicious_likelihood
         }
 
-    def format_report(self, scan_results, detailed=False):
-        """Format scan results into a readable report"""
-        report = []
-        report.append("===============================================")
-        report.append("TAMPERMONKEY SCRIPT SECURITY SCAN REPORT")
-        report.append("===============================================")
-        report.append("")
+    def iter_report(self, scan_results, detailed=False):
+        """Yield the lines of a readable report for scan results"""
+        yield "==============================================="
+        yield "TAMPERMONKEY SCRIPT SECURITY SCAN REPORT"
+        yield "==============================================="
+        yield ""
         
         # Metadata section
         if "metadata" in scan_results and scan_results["metadata"]:
-            report.append("SCRIPT METADATA:")
-            report.append("--------------")
+            yield "SCRIPT METADATA:"
+            yield "--------------"
             for key, value in scan_results["metadata"].items():
-                report.append(f"  @{key}: {value}")
-            report.append("")
+                yield f"  @{key}: {value}"
+            yield ""
         
         # Summary section
-        report.append("SCAN SUMMARY:")
-        report.append("------------")
-        report.append(f"  Script size: {scan_results.get('script_size_bytes', 0):,} bytes")
-        report.append(f"  Total risk score: {scan_results.get('total_risk_score', 0)}")
-        report.append(f"  Malicious likelihood: {scan_results.get('malicious_likelihood', 'Unknown')}")
-        report.append(f"  Suspicious patterns found: {len(scan_results.get('findings', []))}")
-        report.append(f"  Suspicious external URLs: {len(scan_results.get('suspicious_urls', []))}")
-        report.append("")
+        yield "SCAN SUMMARY:"
+        yield "------------"
+        yield f"  Script size: {scan_results.get('script_size_bytes', 0):,} bytes"
+        yield f"  Total risk score: {scan_results.get('total_risk_score', 0)}"
+        yield f"  Malicious likelihood: {scan_results.get('malicious_likelihood', 'Unknown')}"
+        yield f"  Suspicious patterns found: {len(scan_results.get('findings', []))}"
+        yield f"  Suspicious external URLs: {len(scan_results.get('suspicious_urls', []))}"
+        yield ""
         
         # Suspicious URLs
         if scan_results.get("suspicious_urls"):
-            report.append("SUSPICIOUS EXTERNAL URLS:")
-            report.append("------------------------")
+            yield "SUSPICIOUS EXTERNAL URLS:"
+            yield "------------------------"
             for url in scan_results["suspicious_urls"]:
-                report.append(f"  - {url}")
-            report.append("")
+                yield f"  - {url}"
+            yield ""
         
         # Detailed findings
         if scan_results.get("findings"):
-            report.append("SUSPICIOUS PATTERNS DETECTED:")
-            report.append("---------------------------")
+            yield "SUSPICIOUS PATTERNS DETECTED:"
+            yield "---------------------------"
             
             # Group findings by pattern name for a cleaner report
             findings_by_pattern = {}
@@ -235,16 +390,16 @@ class TampermonkeyScanner:
                 description = pattern_findings[0]["description"]
                 risk_score = pattern_findings[0]["risk_score"]
                 
-                report.append(f"  {pattern_name} (Risk: {risk_score}/10)")
-                report.append(f"  Description: {description}")
-                report.append(f"  Occurrences: {len(pattern_findings)}")
+                yield f"  {pattern_name} (Risk: {risk_score}/10)"
+                yield f"  Description: {description}"
+                yield f"  Occurrences: {len(pattern_findings)}"
                 
                 if detailed:
-                    report.append("  Details:")
+                    yield "  Details:"
                     for finding in pattern_findings:
-                        report.append(f"    Line {finding['line']}: {finding['match']}")
-                        report.append(f"    Context: {finding['context']}")
-                        report.append("")
+                        yield f"    Line {finding['line']}: {finding['match']}"
+                        yield f"    Context: {finding['context']}"
+                        yield ""
                 else:
                     # Just show the first occurrence as an example with more context
                     example = pattern_findings[0]
@@ -253,46 +408,53 @@ class TampermonkeyScanner:
                     context = example['context']
 
                     # Create a more informative example line
-                    report.append(f"  Example (Line {line_num}):")
-                    report.append(f"    Match: {match_text}")
+                    yield f"  Example (Line {line_num}):"
+                    yield f"    Match: {match_text}"
 
                     # Create a context with the suspicious pattern in bold using ANSI escape codes
-                    if match_text in context:
+                    offset = example.get('match_offset_in_context')
+                    if offset is None and match_text in context:
+                        # Results saved before offsets were recorded
+                        offset = context.find(match_text)
+
+                    if offset is not None:
                         # Split the context at the match
-                        before_match = context[:context.find(match_text)]
-                        after_match = context[context.find(match_text) + len(match_text):]
+                        before_match = context[:offset]
+                        after_match = context[offset + len(match_text):]
 
                         # Use ANSI escape codes for bold in terminal
                         # \033[1m enables bold, \033[0m resets formatting
                         highlighted_context = f"{before_match}\033[1m{match_text}\033[0m{after_match}"
-                        report.append(f"    Context: {highlighted_context}")
+                        yield f"    Context: {highlighted_context}"
                     else:
                         # Fallback if the match isn't found in the context
-                        report.append(f"    Context: {context}")
+                        yield f"    Context: {context}"
 
-                    report.append("")
+                    yield ""
 
-                report.append("")
+                yield ""
 
         # Recommendations section
-        report.append("RECOMMENDATIONS:")
-        report.append("----------------")
+        yield "RECOMMENDATIONS:"
+        yield "----------------"
 
         if scan_results.get('malicious_likelihood') == "High":
-            report.append("  HIGH RISK DETECTED! This script has multiple high-risk patterns and should NOT be installed")
-            report.append("  without a thorough code review by a security professional.")
+            yield "  HIGH RISK DETECTED! This script has multiple high-risk patterns and should NOT be installed"
+            yield "  without a thorough code review by a security professional."
         elif scan_results.get('malicious_likelihood') == "Medium":
-            report.append("  MEDIUM RISK DETECTED! Review the suspicious patterns carefully before installing this script.")
-            report.append("  Consider modifying the script to remove or limit risky behaviors.")
+            yield "  MEDIUM RISK DETECTED! Review the suspicious patterns carefully before installing this script."
+            yield "  Consider modifying the script to remove or limit risky behaviors."
         else:
-            report.append("  LOW RISK DETECTED. This script appears to be relatively safe, but still review")
-            report.append("  any suspicious patterns before installing.")
+            yield "  LOW RISK DETECTED. This script appears to be relatively safe, but still review"
+            yield "  any suspicious patterns before installing."
 
-        report.append("")
-        report.append("Remember: No automated scanner can guarantee script safety. Always review code carefully.")
-        report.append("===============================================")
+        yield ""
+        yield "Remember: No automated scanner can guarantee script safety. Always review code carefully."
+        yield "==============================================="
 
-        return "\n".join(report)
+    def format_report(self, scan_results, detailed=False):
+        """Format scan results into a readable report"""
+        return "\n".join(self.iter_report(scan_results, detailed))
 
 def main():
     parser = argparse.ArgumentParser(description='Scan Tampermonkey/Greasemonkey userscripts for malicious patterns')
@@ -323,23 +485,26 @@ def main():
     # Scan the script
     scan_results = scanner.scan_script(script_content)
 
-    # Generate report
+    # Generate report; the text report is streamed line by line
     if args.json:
-        report = json.dumps(scan_results, indent=2)
+        report_lines = [json.dumps(scan_results, indent=2)]
     else:
-        report = scanner.format_report(scan_results, detailed=args.detailed)
+        report_lines = scanner.iter_report(scan_results, detailed=args.detailed)
 
     # Output report
     if args.output:
         try:
             with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(report)
+                f.writelines(f"{line}\n" for line in report_lines)
             logger.info(f"Report saved to {args.output}")
         except Exception as e:
             logger.error(f"Error writing to output file: {e}")
-            print(report)
+            if args.json:
+                print(report_lines[0])
+            else:
+                print(scanner.format_report(scan_results, detailed=args.detailed))
     else:
-        print(report)
+        sys.stdout.writelines(f"{line}\n" for line in report_lines)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,13 +1,19 @@
 # Install required packages
 # pip install yt_dlp mutagen
 
-import yt_dlp
 import mutagen
 import os
-from mutagen.id3 import ID3, COMM, TALB, TPE1, TRCK, TIT2, TYER, TCON, TBPM
+from mutagen.mp3 import MP3
+from mutagen.id3 import COMM, TALB, TPE1, TRCK, TIT2, TYER, TCON, TBPM
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # YouTube URL of the album
 url = "https://www.youtube.com/watch?v=eHgktVIHLYM"
 
@@ -63,52 +69,93 @@ def timestamp_to_seconds(timestamp):
         minutes, seconds = map(int, parts)
         return minutes * 60 + seconds
 
+# Precompute each track's start and duration in seconds for ffmpeg
+for track in album_info["tracks"]:
+    track["start_seconds"] = timestamp_to_seconds(track["start_time"])
+    if track["end_time"]:
+        track["duration_seconds"] = timestamp_to_seconds(track["end_time"]) - track["start_seconds"]
+    else:
+        # Use None to copy until the end of the file
+        track["duration_seconds"] = None
+
 # Function to add ID3 tags directly
 def add_id3_tags(file_path, track_info, track_num):
+    audio = MP3(file_path)
+    if audio.tags is None:
+        audio.add_tags()
+    tags = audio.tags
+
     # Remove any existing tags
-    try:
-        id3 = ID3(file_path)
-        id3.delete()
-    except:
-        pass
-
-    # Create new ID3 tag
-    id3 = ID3()
-
-    # Add basic tags
-    id3.add(TIT2(encoding=3, text=track_info['title']))
-    id3.add(TPE1(encoding=3, text=track_info['artist']))
-    id3.add(TALB(encoding=3, text=album_info['album']))
-    id3.add(TYER(encoding=3, text=album_info['year']))
-    id3.add(TCON(encoding=3, text=album_info['genre']))
-    id3.add(TRCK(encoding=3, text=str(track_num)))
+    tags.clear()
+
+    # Basic tags
+    frames = {
+        'TIT2': [TIT2(encoding=3, text=track_info['title'])],
+        'TPE1': [TPE1(encoding=3, text=track_info['artist'])],
+        'TALB': [TALB(encoding=3, text=album_info['album'])],
+        'TYER': [TYER(encoding=3, text=album_info['year'])],
+        'TCON': [TCON(encoding=3, text=album_info['genre'])],
+        'TRCK': [TRCK(encoding=3, text=str(track_num))],
+        'COMM': [],
+    }
 
     # Add BPM if available
     if 'bpm' in track_info:
-        id3.add(TBPM(encoding=3, text=track_info['bpm']))
-
-    # Add producer info as comment
-    if 'producer' in track_info:
-        id3.add(COMM(
-            encoding=3,
-            lang='eng',
-            desc='Producer',
-            text=track_info['producer']
-        ))
-
-    # Add collaborator info if available
-    if 'collaborator' in track_info:
-        id3.add(COMM(
-            encoding=3,
-            lang='eng',
-            desc='Collaborator',
-            text=track_info['collaborator']
-        ))
-
-    # Save tags
-    id3.save(file_path)
+        frames['TBPM'] = [TBPM(encoding=3, text=track_info['bpm'])]
+
+    # Add producer and collaborator info as comments
+    for key, desc in (('producer', 'Producer'), ('collaborator', 'Collaborator')):
+        if key in track_info:
+            frames['COMM'].append(COMM(
+                encoding=3,
+                lang='eng',
+                desc=desc,
+                text=track_info[key]
+            ))
+
+    for frame_id, values in frames.items():
+        tags.setall(frame_id, values)
+
+    # Save tags in one write; mutagen's default padding lets a later
+    # retag rewrite the header in place instead of the whole file
+    audio.save(v2_version=4)
     print(f"Added tags to {os.path.basename(file_path)}")
 
+# Function to split out and tag a single track
+def process_track(track, track_num, mp3_filename, output_dir):
+    output_file = os.path.join(output_dir, f"{track_num:02d}. {track['artist']} - {track['title']}.mp3")
+
+    # Skip if file already exists and force_retag is False
+    if os.path.exists(output_file):
+        print(f"Track {track_num} already exists: {output_file}")
+        # Retag existing files to ensure consistent tagging
+        add_id3_tags(output_file, track, track_num)
+        return
+
+    start_seconds = track["start_seconds"]
+    duration = track["duration_seconds"]
+
+    print(f"Extracting track {track_num}: {track['artist']} - {track['title']}")
+
+    # Split using ffmpeg: seek on the input and copy the MP3 frames as-is
+    # (no re-encode), dropping the source's tags so ours are the only ones
+    if duration:
+        ffmpeg_cmd = [
+            'ffmpeg', '-nostdin', '-ss', str(start_seconds), '-i', mp3_filename,
+            '-t', str(duration),
+            '-map', '0:a', '-c:a', 'copy', '-map_metadata', '-1', '-y', output_file
+        ]
+    else:
+        ffmpeg_cmd = [
+            'ffmpeg', '-nostdin', '-ss', str(start_seconds), '-i', mp3_filename,
+            '-map', '0:a', '-c:a', 'copy', '-map_metadata', '-1', '-y', output_file
+        ]
+
+    subprocess.run(ffmpeg_cmd)
+
+    # Add tags
+    add_id3_tags(output_file, track, track_num)
+
 def main():
     # Extract video ID from URL
     video_id = url.split("v=")[-1].split("&")[0]
@@ -121,6 +168,9 @@ def main():
     else:
         print("Starting download of Apsara compilation...")
 
+        # Imported here so reruns against the cached files skip its startup cost
+        import yt_dlp
+
         # Download options
         ydl_opts = {
             'format': 'bestaudio/best',
@@ -139,8 +189,10 @@ def main():
 
     # Load info from json file if it exists
     if os.path.exists(info_filename):
-        with open(info_filename, 'r') as f:
-            info_data = json.load(f)
+        # The info file lists every format and thumbnail, so it can be several MB
+        with open(info_filename, 'rb') as f:
+            data = f.read()
+        info_data = orjson.loads(data) if orjson is not None else json.loads(data)
 
         # Get the duration for the last track's end time
         duration = info_data.get('duration')
@@ -148,6 +200,7 @@ def main():
             hours, remainder = divmod(duration, 3600)
             minutes, seconds = divmod(remainder, 60)
             album_info["tracks"][-1]["end_time"] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            album_info["tracks"][-1]["duration_seconds"] = duration - album_info["tracks"][-1]["start_seconds"]
 
     print("Starting to split tracks...")
 
@@ -155,47 +208,18 @@ def main():
     output_dir = "Apsara (2005)"
     os.makedirs(output_dir, exist_ok=True)
 
-    # Split and tag each track
-    for i, track in enumerate(album_info["tracks"]):
-        track_num = i + 1
-        output_file = os.path.join(output_dir, f"{track_num:02d}. {track['artist']} - {track['title']}.mp3")
-
-        # Skip if file already exists and force_retag is False
-        if os.path.exists(output_file):
-            print(f"Track {track_num} already exists: {output_file}")
-            # Retag existing files to ensure consistent tagging
-            add_id3_tags(output_file, track, track_num)
-            continue
-
-        start_seconds = timestamp_to_seconds(track["start_time"])
-        if track["end_time"]:
-            end_seconds = timestamp_to_seconds(track["end_time"])
-            duration = end_seconds - start_seconds
-        else:
-            # Use None for end_time to copy until the end of the file
-            duration = None
-
-        print(f"Extracting track {track_num}: {track['artist']} - {track['title']}")
-
-        # Split using ffmpeg
-        if duration:
-            ffmpeg_cmd = [
-                'ffmpeg', '-i', mp3_filename,
-                '-ss', str(start_seconds), '-t', str(duration),
-                '-c:a', 'libmp3lame', '-q:a', '0', '-y', output_file
-            ]
-        else:
-            ffmpeg_cmd = [
-                'ffmpeg', '-i', mp3_filename,
-                '-ss', str(start_seconds),
-                '-c:a', 'libmp3lame', '-q:a', '0', '-y', output_file
-            ]
-
-        subprocess.run(ffmpeg_cmd)
-
-        # Add tags
-        add_id3_tags(output_file, track, track_num)
-    
+    # Split and tag the tracks in parallel; each split is its own ffmpeg process
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {
+            executor.submit(process_track, track, i + 1, mp3_filename, output_dir): i + 1
+            for i, track in enumerate(album_info["tracks"])
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error processing track {futures[future]}: {e}")
+
     print(f"Album processing complete! All tracks saved to {output_dir} directory")
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Metadata handling tests for compress_file.compress_image"""
+
+import os
+import tempfile
+import unittest
+
+try:
+    from PIL import Image, ImageCms, features
+except ImportError:
+    Image = None
+
+from compress_file import compress_image
+
+XMP = b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF/></x:xmpmeta>'
+
+
+@unittest.skipIf(Image is None, "Pillow is not installed")
+class CompressImageMetadataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.temp_dir.name, "photo.jpg")
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 CW
+        self.exif = exif.tobytes()
+        self.icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+
+        # Noise at quality 100, so the recompressed copy is always smaller
+        img = Image.frombytes("RGB", (256, 256), os.urandom(256 * 256 * 3))
+        img.save(self.source, format="JPEG", quality=100, exif=self.exif,
+                 icc_profile=self.icc, comment=b"secret comment", xmp=XMP)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def compress(self, name, **kwargs):
+        output = os.path.join(self.temp_dir.name, name)
+        success, old_size, new_size, message = compress_image(
+            self.source, output, dry_run=False, copy_mode=True, **kwargs)
+        self.assertTrue(success, message)
+        self.assertLess(new_size, old_size)
+        return output
+
+    def test_metadata_is_stripped_by_default(self):
+        output = self.compress("stripped.jpg", use_avif=False)
+        with Image.open(output) as img:
+            for key in ("exif", "icc_profile", "comment", "xmp"):
+                self.assertNotIn(key, img.info)
+        with open(output, 'rb') as f:
+            data = f.read()
+        self.assertNotIn(b"secret comment", data)
+        self.assertNotIn(b"adobe:ns:meta", data)
+
+    def test_keep_metadata_keeps_exif_and_icc(self):
+        output = self.compress("kept.jpg", use_avif=False, keep_metadata=True)
+        with Image.open(output) as img:
+            self.assertEqual(img.info.get("exif"), self.exif)
+            self.assertEqual(img.info.get("icc_profile"), self.icc)
+
+    def test_avif_keeps_exif_and_icc(self):
+        if not features.check("avif"):
+            self.skipTest("Pillow was built without AVIF support")
+        output = os.path.join(self.temp_dir.name, "photo.jpg")
+        success, _, _, message = compress_image(
+            self.source, output, use_avif=True, dry_run=False, copy_mode=True)
+        self.assertTrue(success, message)
+        with Image.open(os.path.join(self.temp_dir.name, "photo.avif")) as img:
+            self.assertEqual(img.getexif().get(0x0112), 6)
+            self.assertEqual(img.info.get("icc_profile"), self.icc)
+
+
+if __name__ == "__main__":
+    unittest.main()